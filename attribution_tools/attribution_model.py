@@ -6,8 +6,8 @@ import json
 import logging
 from pathlib import Path, PurePath
 
-import dill as pickle
-import pandas as pd
+import joblib
+import numpy as np
 
 META_DATA_FILENAME = "meta_data.json"
 MODEL_PATH_LOCATION = "data"
@@ -16,6 +16,46 @@ DATABASE_VERSION = "(0, 0, 1)"
 TOP_N = 3
 
 
+# Cache of (model, meta_data) per path pair. Only successful loads are stored, so a model
+# file deployed after a failed attempt is picked up on the next call without a restart.
+_MODEL_CACHE: dict = {}
+
+
+def _load_model_cached(model_path, meta_data_path):
+    """Load the pickled model and its meta data, cached per path pair.
+
+    Unpickling the model dominates cold prediction latency, so a successful load is shared
+    by all `AttributionToolsModel` instances pointing at the same files.
+    """
+    cache_key = (model_path, meta_data_path)
+    cached = _MODEL_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+
+    log = logging.getLogger(__name__)
+
+    meta_data = None
+    try:
+        with open(meta_data_path, "rb") as filename:
+            meta_data = json.load(filename)
+        log.info("The model meta data downloaded from %s: ", meta_data_path)
+    except Exception as exception:
+        log.warning("The exception happened and the json file can not be loaded")
+        log.exception(exception)
+
+    model = None
+    try:
+        # mmap_mode lets the model's numpy arrays be memory-mapped and shared across processes.
+        model = joblib.load(model_path, mmap_mode="r")
+        log.info("The pickle file with model was loaded from %r location", model_path)
+    except Exception as exception:
+        log.warning("The exception happened and the pickle file can not be loaded")
+        log.exception(exception)
+    if model is not None:
+        _MODEL_CACHE[cache_key] = (model, meta_data)
+    return model, meta_data
+
+
 class AttributionToolsModel:
     """The class used for initializing the model and making the predictions."""
 
@@ -29,6 +69,8 @@ class AttributionToolsModel:
     ):
         self.log = logging.getLogger(__name__)
         self.db_version = database_version
+        # Cached copy of model.classes_, resolved on the first prediction.
+        self._classes = None
         if model is None:
             if initial_path is None:
                 initial_path = PurePath(Path(__file__).parent.resolve(), MODEL_PATH_LOCATION)
@@ -41,46 +83,61 @@ class AttributionToolsModel:
 
     def predict(self, incident_str):
         """Predict the intrusion set based on incident string"""
-        if not isinstance(incident_str, str) or len(incident_str) == 0:
-            return {"label": -1, "db_version": self.db_version}
+        return self.predict_batch([incident_str])[0]
+
+    def predict_batch(self, incident_strs):
+        """Predict intrusion sets for a list of incident strings with a single model call.
+
+        :return: list of prediction dicts, one per input, in input order.
+        """
+        results = [{"label": -1, "db_version": self.db_version} for _ in incident_strs]
+        valid_indices = [
+            index
+            for index, incident_str in enumerate(incident_strs)
+            if isinstance(incident_str, str) and len(incident_str) > 0
+        ]
+        if not valid_indices:
+            return results
         try:
             if self.model is None:
                 self.model = self.load_files()
                 if self.model is None:
-                    return {"label": -2, "db_version": self.db_version}
-            y_test_pred = self.model.predict_proba([incident_str])
-            df_pred = pd.DataFrame(data={"labels": self.model.classes_, "probas": y_test_pred[0]})
-            label_val = df_pred.sort_values(by=["probas"], ascending=False).head(TOP_N).to_dict("list")
-            return {"label": label_val, "db_version": self.db_version}
+                    for index in valid_indices:
+                        results[index] = {"label": -2, "db_version": self.db_version}
+                    return results
+            if self._classes is None:
+                self._classes = np.asarray(self.model.classes_)
+            probas = self.model.predict_proba([incident_strs[index] for index in valid_indices])
+            if probas.shape[1] > TOP_N:
+                top_indices = np.argpartition(probas, -TOP_N, axis=1)[:, -TOP_N:]
+            else:
+                top_indices = np.tile(np.arange(probas.shape[1]), (probas.shape[0], 1))
+            top_probas = np.take_along_axis(probas, top_indices, axis=1)
+            order = np.argsort(top_probas, axis=1)[:, ::-1]
+            top_indices = np.take_along_axis(top_indices, order, axis=1)
+            top_probas = np.take_along_axis(top_probas, order, axis=1)
+            for row, index in enumerate(valid_indices):
+                label_val = {
+                    "labels": self._classes[top_indices[row]].tolist(),
+                    "probas": top_probas[row].tolist(),
+                }
+                results[index] = {"label": label_val, "db_version": self.db_version}
+            return results
         except Exception as exception:
-            self.log.warning("The exception happened and the score can not be predicted for %r", incident_str)
+            self.log.warning("The exception happened and the score can not be predicted for %r", incident_strs)
             self.log.exception(exception)
-        return {"label": -3, "db_version": self.db_version}
+        for index in valid_indices:
+            results[index] = {"label": -3, "db_version": self.db_version}
+        return results
 
     def load_files(self):
-        """Load the model and meta data"""
-        try:
-            if self.db_version == DATABASE_VERSION:
-                with open(self.meta_data_path_location, "rb") as filename:
-                    meta_data = json.load(filename)
-                self.log.info("The model meta data downloaded from %s: ", self.meta_data_path_location)
-                self.db_version = meta_data["db_version"]
-                self.log.info(
-                    "The model version is %s, the meta data creation time is %s: ",
-                    meta_data["db_version"],
-                    meta_data["time_metadata_created"],
-                )
-        except Exception as exception:
-            self.log.warning("The exception happened and the json file can not be loaded")
-            self.log.exception(exception)
-
-        model = None
-        try:
-            with open(self.model_path_location, "rb") as filename:
-                model = pickle.load(filename)
-            self.log.info("The pickle file with model was loaded from %r location", self.model_path_location)
-        except Exception as exception:
-            self.log.warning("The exception happened and the pickle file can not be loaded")
-            self.log.exception(exception)
-        finally:
-            return model
+        """Load the model and meta data through the module-level cache"""
+        model, meta_data = _load_model_cached(str(self.model_path_location), str(self.meta_data_path_location))
+        if meta_data is not None and self.db_version == DATABASE_VERSION:
+            self.db_version = meta_data["db_version"]
+            self.log.info(
+                "The model version is %s, the meta data creation time is %s: ",
+                meta_data["db_version"],
+                meta_data["time_metadata_created"],
+            )
+        return model
@@ -1,6 +1,5 @@
 """The module used to genetate incidents data based on intrusion sets"""
 import logging
-import math
 import random
 from math import ceil
 from typing import List
@@ -9,28 +8,104 @@ import numpy
 from scipy.stats import betabinom
 from scipy.stats.sampling import DiscreteAliasUrn
 
-from attribution_tools.parsers import AttackPattern, IntrusionSet, Malware, Tool
+from attribution_tools.parsers import AttackPattern, Entity, IntrusionSet, Malware, Tool
+
+try:
+    from numba import njit
+except ImportError:  # numba is an optional accelerator, scipy sampling is the fallback
+    njit = None
 
 logger = logging.getLogger()
 logger.setLevel(logging.ERROR)
 
+# Shared generator for the vectorized sampling paths.
+_RNG = numpy.random.default_rng()
 
-def generate_incident_size(lbound: int, ubound: int) -> int:
-    """Generate the size of incident based on"""
-    alpha, beta = 1.5, 10.0
 
+def seed_rng(seed=None) -> None:
+    """Re-seed the module generator, e.g. once per joblib worker for reproducible batches."""
+    global _RNG  # pylint: disable=global-statement
+    _RNG = numpy.random.default_rng(seed)
+    # Cached samplers keep a reference to the previous generator, so they must be rebuilt.
+    _SIZE_SAMPLERS.clear()
+
+
+# Cache of alias-method samplers keyed by the distribution parameters. The alias table setup
+# is far more expensive than drawing from it, so it is built once per parameter combination.
+_SIZE_SAMPLERS: dict = {}
+
+
+def _size_pmf(lbound: int, ubound: int, alpha: float, beta: float) -> numpy.ndarray:
+    """Return the betabinom PMF over the incident size support."""
     region_size = ceil(ubound - lbound)
     assert region_size > 0, f"Wrong bound arguments: {lbound}, {ubound}"
+    return betabinom(region_size, alpha, beta).pmf(numpy.arange(region_size + 1))
+
+
+def _build_alias_tables(pmf_values: numpy.ndarray) -> tuple:
+    """Build Walker alias-method tables (prob, alias) for a discrete distribution."""
+    support_size = len(pmf_values)
+    prob = numpy.zeros(support_size)
+    alias = numpy.zeros(support_size, dtype=numpy.int64)
+    scaled = numpy.asarray(pmf_values, dtype=numpy.float64) * support_size / numpy.sum(pmf_values)
+
+    small = [index for index, value in enumerate(scaled) if value < 1.0]
+    large = [index for index, value in enumerate(scaled) if value >= 1.0]
+    while small and large:
+        small_index = small.pop()
+        large_index = large.pop()
+        prob[small_index] = scaled[small_index]
+        alias[small_index] = large_index
+        scaled[large_index] -= 1.0 - scaled[small_index]
+        (small if scaled[large_index] < 1.0 else large).append(large_index)
+    for index in large + small:
+        prob[index] = 1.0
+    return prob, alias
+
+
+if njit is not None:
+
+    @njit(cache=True)
+    def _alias_draw_batch(prob, alias, u_index, u_accept, out):  # pragma: no cover - needs numba
+        """Fill `out` with alias-method draws for pre-generated uniform variates."""
+        support_size = len(prob)
+        for draw in range(len(out)):
+            index = int(u_index[draw] * support_size)
+            out[draw] = index if u_accept[draw] < prob[index] else alias[index]
+
+
+def _get_size_sampler(lbound: int, ubound: int, alpha: float = 1.5, beta: float = 10.0):
+    """Return a cached alias-method sampler for the incident size distribution.
+
+    With numba installed the sampler is a (prob, alias) table pair for the jitted draw loop,
+    otherwise it is a scipy DiscreteAliasUrn.
+    """
+    key = (lbound, ubound, alpha, beta)
+    sampler = _SIZE_SAMPLERS.get(key)
+    if sampler is None:
+        pmf_values = _size_pmf(lbound, ubound, alpha, beta)
+        if njit is not None:
+            sampler = _build_alias_tables(pmf_values)
+        else:
+            sampler = DiscreteAliasUrn(pmf_values, random_state=_RNG)
+        _SIZE_SAMPLERS[key] = sampler
+    return sampler
+
+
+def generate_incident_sizes(lbound: int, ubound: int, count: int) -> numpy.ndarray:
+    """Generate a batch of incident sizes in a single draw from the cached sampler."""
+    sampler = _get_size_sampler(lbound, ubound)
+    if njit is not None:
+        prob, alias = sampler
+        out = numpy.empty(count, dtype=numpy.int64)
+        _alias_draw_batch(prob, alias, _RNG.random(count), _RNG.random(count), out)
+        return out + lbound
+    return sampler.rvs(size=count) + lbound
 
-    percent_point_func = numpy.arange(
-        betabinom.ppf(0.0, region_size, alpha, beta), betabinom.ppf(1.0, region_size, alpha, beta)
-    )
-    random_variable = betabinom(region_size, alpha, beta)
-
-    pmf_values = random_variable.pmf(percent_point_func).tolist()
-    generator = DiscreteAliasUrn(pmf_values, random_state=numpy.random.default_rng())
 
-    return (generator.rvs(size=1) + lbound)[0]
+def generate_incident_size(lbound: int, ubound: int) -> int:
+    """Generate the size of incident based on"""
+    return generate_incident_sizes(lbound, ubound, 1)[0]
 
 
 class IncidentGenerator:
@@ -47,8 +122,66 @@ class IncidentGenerator:
     # fraction taken by other elements
     FRAC_OTHER = 0.1
 
-    def generate(self, source: IntrusionSet) -> list:
-        """Generation of the incident content."""
+    def compute_ks(self, sizes: numpy.ndarray) -> dict:
+        """Precompute the per-category sample counts for a batch of incident sizes."""
+        return {
+            "attack-pattern": numpy.ceil(sizes * self.FRAC_ATTACK_PATTERN).astype(int),
+            "tool": numpy.ceil(sizes * self.FRAC_TOOLS).astype(int),
+            "malware": numpy.ceil(sizes * self.FRAC_MALWARE).astype(int),
+            "other": numpy.ceil(sizes * self.FRAC_OTHER).astype(int),
+        }
+
+    def generate_batch(self, source: IntrusionSet, sizes: numpy.ndarray) -> List[str]:
+        """Generate a batch of incident strings for pre-drawn incident sizes.
+
+        The per-category semantic ids are materialized as numpy arrays once per intrusion set and
+        the per-incident selections are drawn with numpy, avoiding the per-incident Python-level
+        `random.choices`/`set` calls of the single-incident path.
+        """
+        n_size_max = sum(
+            [
+                len(source.attack_patterns),
+                len(source.malwares),
+                len(source.tools),
+                len(source.indicators),
+                len(source.identities),
+                len(source.locations),
+                len(source.vulnerabilities),
+            ]
+        )
+        if n_size_max < self.N_SIZE_MIN:
+            n_size_max = self.N_SIZE_MIN
+        sizes = numpy.minimum(sizes, n_size_max)
+
+        other_entities = source.indicators + source.vulnerabilities + source.identities + source.locations
+        ks = self.compute_ks(sizes)
+        # (entities, per-incident sample counts, sampled with replacement)
+        categories = (
+            (source.attack_patterns, ks["attack-pattern"], True),
+            (source.tools, ks["tool"], True),
+            (source.malwares, ks["malware"], True),
+            (other_entities, ks["other"], False),
+        )
+
+        incidents: List[list] = [[] for _ in range(len(sizes))]
+        for entities, k_values, with_replacement in categories:
+            if not entities:
+                continue
+            semantic_ids = numpy.array([item.semantic_id for item in entities])
+            for content, k_value in zip(incidents, k_values):
+                if with_replacement:
+                    selection = numpy.unique(_RNG.integers(0, len(semantic_ids), k_value))
+                else:
+                    selection = _RNG.choice(len(semantic_ids), size=min(len(semantic_ids), k_value), replace=False)
+                content.extend(semantic_ids[selection])
+        return [" ".join(content) for content in incidents]
+
+    def generate(self, source: IntrusionSet, n_size: int = None) -> list:
+        """Generation of the incident content.
+
+        The incident size can be pre-drawn in a batch via `generate_incident_sizes` and passed
+        as `n_size`, otherwise a single size is drawn here.
+        """
         content = []
         n_size_max = sum(
             [
@@ -64,49 +197,50 @@ class IncidentGenerator:
         if n_size_max < self.N_SIZE_MIN:
             n_size_max = self.N_SIZE_MIN
 
-        n_size = generate_incident_size(self.N_SIZE_MIN, self.N_SIZE_MAX)
+        if n_size is None:
+            n_size = generate_incident_size(self.N_SIZE_MIN, self.N_SIZE_MAX)
         n_size = min(n_size, n_size_max)
 
-        content.extend(self.sample_attack_patterns(source.attack_patterns, n_size))
-        content.extend(self.sample_tools(source.tools, n_size))
-        content.extend(self.sample_malwares(source.malwares, n_size))
+        ks = self.compute_ks(numpy.asarray([n_size]))
+        content.extend(self.sample_attack_patterns(source.attack_patterns, int(ks["attack-pattern"][0])))
+        content.extend(self.sample_tools(source.tools, int(ks["tool"][0])))
+        content.extend(self.sample_malwares(source.malwares, int(ks["malware"][0])))
         other_entities = source.indicators + source.vulnerabilities + source.identities + source.locations
-        content.extend(self.sample_others(other_entities, n_size))
+        content.extend(self.sample_others(other_entities, int(ks["other"][0])))
 
         return content
 
-    def sample_attack_patterns(self, source: List[AttackPattern], max_incident_size) -> List[str]:
+    @staticmethod
+    def _sample_with_replacement(source: List[Entity], n_max: int) -> List[str]:
+        """Draw n_max indices with replacement and deduplicate them on integers."""
+        indices = numpy.unique(_RNG.integers(0, len(source), n_max))
+        return [source[index].semantic_id for index in indices]
+
+    def sample_attack_patterns(self, source: List[AttackPattern], n_sample: int) -> List[str]:
         """Creates the sample list of attack patterns."""
         result = []
         if source:
-            n_max_attack_patterns = math.ceil(max_incident_size * self.FRAC_ATTACK_PATTERN)
-            selection = set(random.choices(source, k=n_max_attack_patterns))
-            result.extend([item.semantic_id for item in selection])
+            result.extend(self._sample_with_replacement(source, n_sample))
         return result
 
-    def sample_tools(self, source: List[Tool], max_incident_size) -> List[str]:
+    def sample_tools(self, source: List[Tool], n_sample: int) -> List[str]:
         """Creates the sample list of tools."""
         result = []
         if source:
-            n_max_tools = math.ceil(max_incident_size * self.FRAC_TOOLS)
-            selection = set(random.choices(source, k=n_max_tools))
-            result.extend([item.semantic_id for item in selection])
+            result.extend(self._sample_with_replacement(source, n_sample))
         return result
 
-    def sample_malwares(self, source: List[Malware], max_incident_size) -> List[str]:
+    def sample_malwares(self, source: List[Malware], n_sample: int) -> List[str]:
         """Creates the sample list of malwares."""
         result = []
         if source:
-            n_max_malwares = math.ceil(max_incident_size * self.FRAC_MALWARE)
-            selection = set(random.choices(source, k=n_max_malwares))
-            result.extend([item.semantic_id for item in selection])
+            result.extend(self._sample_with_replacement(source, n_sample))
         return result
 
-    def sample_others(self, source: list, max_incident_size) -> List[str]:
+    def sample_others(self, source: list, n_sample: int) -> List[str]:
         """Creates the sample list of other STIX2 entities."""
         result = []
         if source:
-            n_max_others = math.ceil(max_incident_size * self.FRAC_OTHER)
-            selection = random.sample(source, min(len(source), n_max_others))  # do note the difference of this method
+            selection = random.sample(source, min(len(source), n_sample))  # do note the difference of this method
             result.extend([item.semantic_id for item in selection])
         return result
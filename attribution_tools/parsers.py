@@ -5,11 +5,12 @@ json intrusion sets to IntrusionSet object.
 
 import json
 import typing
+from collections import defaultdict
 from dataclasses import asdict, dataclass, field
 from typing import List, Mapping, Union
 
 
-@dataclass
+@dataclass(slots=True)
 class Entity:
     """The abstract class that would be further used for inheritance."""
 
@@ -20,59 +21,71 @@ class Entity:
     relation: str = ""
 
     def __hash__(self):
-        return hash(self.entity_type + self.identifier)
+        return hash((self.entity_type, self.identifier))
 
 
-@dataclass(eq=False)
+@dataclass(eq=False, slots=True)
 class AttackPattern(Entity):
     """The Attack Pattern class"""
 
     entity_type: str = "attack-pattern"
 
 
-@dataclass(eq=False)
+@dataclass(eq=False, slots=True)
 class Malware(Entity):
     """The Malware class"""
 
     entity_type: str = "malware"
 
 
-@dataclass(eq=False)
+@dataclass(eq=False, slots=True)
 class Tool(Entity):
     """The Tool class"""
 
     entity_type: str = "tool"
 
 
-@dataclass(eq=False)
+@dataclass(eq=False, slots=True)
 class Identity(Entity):
     """The Identity class"""
 
     entity_type: str = "identity"
 
 
-@dataclass(eq=False)
+@dataclass(eq=False, slots=True)
 class Location(Entity):
     """The Location class"""
 
     entity_type: str = "location"
 
 
-@dataclass(eq=False)
+@dataclass(eq=False, slots=True)
 class Vulnerability(Entity):
     """The Vulnerability class"""
 
     entity_type: str = "vulnerability"
 
 
-@dataclass(eq=False)
+@dataclass(eq=False, slots=True)
 class Indicator(Entity):
     """The Indicator class"""
 
     entity_type: str = "indicator"
 
 
-@dataclass
+# Maps the entity_type string carried by every Entity to the IntrusionSet list field it belongs to.
+_ENTITY_LIST_FIELDS = {
+    "attack-pattern": "attack_patterns",
+    "malware": "malwares",
+    "tool": "tools",
+    "identity": "identities",
+    "location": "locations",
+    "vulnerability": "vulnerabilities",
+    "indicator": "indicators",
+}
+
+
+@dataclass(slots=True)
 class IntrusionSet:
     """The Intrusion Set class"""
 
@@ -88,32 +101,36 @@ class IntrusionSet:
     vulnerabilities: List[Vulnerability] = field(default_factory=list)
     indicators: List[Indicator] = field(default_factory=list)
 
+    # Per-type identifier sets mirroring the entity lists, kept for O(1) membership checks.
+    _seen: Mapping = field(default_factory=dict, repr=False, compare=False)
+    # Memoized asdict snapshot, invalidated whenever a new entity is added.
+    _dict_cache: typing.Optional[dict] = field(default=None, repr=False, compare=False)
+
     @typing.no_type_check
     def add_related_entity(self, entity: Entity) -> None:
         """Add entity for intrusion set"""
-        instance_map = {
-            AttackPattern: self.attack_patterns,
-            Malware: self.malwares,
-            Tool: self.tools,
-            Identity: self.identities,
-            Location: self.locations,
-            Vulnerability: self.vulnerabilities,
-            Indicator: self.indicators,
-        }
-        destination = instance_map[type(entity)]
-        if entity in destination:
+        entity_type = entity.entity_type
+        seen = self._seen.setdefault(entity_type, set())
+        if entity.identifier in seen:
             return
-        destination.append(entity)
+        seen.add(entity.identifier)
+        getattr(self, _ENTITY_LIST_FIELDS[entity_type]).append(entity)
         self.empty = False
+        self._dict_cache = None
 
-    @property
-    def __dict__(self):
-        return asdict(self)
+    def to_dict(self) -> dict:
+        """Return the memoized dict representation (slotted classes cannot override __dict__)."""
+        if self._dict_cache is None:
+            representation = asdict(self)
+            representation.pop("_seen", None)
+            representation.pop("_dict_cache", None)
+            self._dict_cache = representation
+        return self._dict_cache
 
     @property
     def json(self):
         """Return json dumps."""
-        return json.dumps(self.__dict__)
+        return json.dumps(self.to_dict())
 
 
 def get_semantic_id_from_attack_pattern(attack_pattern: dict) -> str:
@@ -219,11 +236,11 @@ def incident_json_to_str(incident_json: dict) -> str:
         "indicator": get_semantic_id_from_indicator,
     }
     for incident_val in incident_json.get("objects", []):
-        incident_val_id = incident_val["id"]
-        for keyword, getter_func in value_functions.items():
-            if incident_val_id.startswith(keyword):
-                incident_list.append(getter_func(incident_val))
-                break
+        # STIX ids always start with "<type>--", so the type is an exact dict key.
+        stix_type = incident_val.get("type") or incident_val["id"].split("--", 1)[0]
+        getter_func = value_functions.get(stix_type)
+        if getter_func is not None:
+            incident_list.append(getter_func(incident_val))
     return " ".join(incident_list)
 
 
@@ -246,51 +263,40 @@ def build_intrusion_set_repr_json(bundle_objects: list) -> Union[IntrusionSet, N
         "indicator": (Indicator, get_semantic_id_from_indicator),
     }
 
-    intrusion_sets = list(filter(lambda item: item["type"] == "intrusion-set", bundle_objects))
+    # Bucket the bundle in a single pass instead of re-filtering it once per STIX type.
+    # Semantic ids are resolved lazily, only for objects actually referenced by a relationship.
+    by_type = defaultdict(list)
+    related_objects = {}
+    for item in bundle_objects:
+        stix_type = item["type"]
+        by_type[stix_type].append(item)
+        stix_value = instance_map.get(stix_type)
+        if stix_value:
+            related_objects[item["id"]] = (stix_value[0], stix_value[1], item)
+
+    intrusion_sets = by_type["intrusion-set"]
     if not intrusion_sets:
         return None
 
     intrusion_set = intrusion_sets[0]
     intrusion_set_shadow = IntrusionSet(identifier=intrusion_set["id"])
-    related_objects = {}
-
-    for stix_type, stix_value in instance_map.items():
-        semantic_handler = stix_value[1]
-        selection = list(filter(lambda item: item["type"] == stix_type, bundle_objects))
-        related_objects.update({item["id"]: (stix_type, semantic_handler(item)) for item in selection})
-
-    selection = list(
-        filter(
-            lambda item: (item["type"] == "relationship") & (item.get("source_ref", None) == intrusion_set["id"]),
-            bundle_objects,
-        )
-    )
-    for relationship in selection:
-        target_ref = relationship.get("target_ref", None)
-        related_object = related_objects.get(target_ref, None)
-        if related_object:
-            class_type = instance_map[related_objects[relationship["target_ref"]][0]][0]
-            item_shadow = class_type(identifier=relationship["target_ref"])
-            item_shadow.is_subject = False
-            item_shadow.relation = relationship["relationship_type"]
-            item_shadow.semantic_id = related_object[1]
-            intrusion_set_shadow.add_related_entity(item_shadow)
 
-    selection = list(
-        filter(
-            lambda item: (item["type"] == "relationship") & (item.get("target_ref", None) == intrusion_set["id"]),
-            bundle_objects,
-        )
-    )
-    for relationship in selection:
-        source_ref = relationship.get("source_ref", None)
-        related_object = related_objects.get(source_ref, None)
+    for relationship in by_type["relationship"]:
+        if relationship.get("source_ref", None) == intrusion_set["id"]:
+            related_ref = relationship.get("target_ref", None)
+            is_subject = False
+        elif relationship.get("target_ref", None) == intrusion_set["id"]:
+            related_ref = relationship.get("source_ref", None)
+            is_subject = True
+        else:
+            continue
+        related_object = related_objects.get(related_ref, None)
         if related_object:
-            class_type = instance_map[related_objects[relationship["source_ref"]][0]][0]
-            item_shadow = class_type(identifier=relationship["source_ref"])
-            item_shadow.is_subject = True
+            class_type, semantic_handler, related_item = related_object
+            item_shadow = class_type(identifier=related_ref)
+            item_shadow.is_subject = is_subject
             item_shadow.relation = relationship["relationship_type"]
-            item_shadow.semantic_id = related_object[1]
+            item_shadow.semantic_id = semantic_handler(related_item)
             intrusion_set_shadow.add_related_entity(item_shadow)
 
     return intrusion_set_shadow
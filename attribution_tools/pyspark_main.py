@@ -40,8 +40,11 @@ def remove_none_values(config: Dict[str, Any]) -> Dict[str, Any]:
     return {k: v for k, v in config.items() if v is not None}
 
 
-def parse_args() -> Dict[str, Any]:
-    """Parses CLI arguments into a configuration dictionary."""
+def parse_args(args=None) -> Dict[str, Any]:
+    """Parses CLI arguments into a configuration dictionary.
+
+    :param args: optional argument list; defaults to sys.argv like argparse itself.
+    """
     parser = argparse.ArgumentParser(description="OpenCTI Attribution Tools Model.")
     parser.add_argument(
         "-l",
@@ -57,7 +60,7 @@ def parse_args() -> Dict[str, Any]:
         help="Base S3 URL under which the model and other outputs of the pipeline are stored.",
         type=str,
     )
-    config = vars(parser.parse_args())
+    config = vars(parser.parse_args(args))
     return remove_none_values(config)
 
 
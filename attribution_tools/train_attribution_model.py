@@ -4,20 +4,48 @@ Implementation of the Attribution Model Retraining module
 
 import logging
 
+import joblib
+import numpy as np
 import pandas as pd
+from joblib import delayed, Parallel
 from packaging import version
-from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
 from sklearn.metrics import f1_score
 from sklearn.model_selection import train_test_split
-from sklearn.naive_bayes import BernoulliNB
 from sklearn.pipeline import make_pipeline
 
-from attribution_tools.generator import IncidentGenerator
+from attribution_tools.generator import generate_incident_sizes, IncidentGenerator, seed_rng
 from attribution_tools.parsers import get_instrusion_sets_stats
 from attribution_tools.utils import increment_database_version
 
 DATABASE_VERSION = "(0, 0, 1)"
 N_PER_LABEL = 100
+BASE_SEED = 27
+
+
+def _generate_label_incidents(label_name, intrusion_set, n_per_label, seed):
+    """Generate all incidents for a single label; runs in a joblib worker process.
+
+    :param seed: seed for the worker's random generator, index-derived so runs are reproducible.
+    :return: tuple of the label name and the list of generated incident strings.
+    """
+    seed_rng(seed)
+    generator = IncidentGenerator()
+    incident_sizes = generate_incident_sizes(generator.N_SIZE_MIN, generator.N_SIZE_MAX, n_per_label)
+    items_list = [items if items else " " for items in generator.generate_batch(intrusion_set, incident_sizes)]
+    return label_name, items_list
+
+
+def save_model(model, model_path):
+    """Serialize the trained model with joblib.
+
+    The model is written uncompressed so its numpy arrays can be memory-mapped at load time.
+
+    :param model: trained sklearn pipeline.
+    :param model_path: destination path for the serialized model.
+    """
+    joblib.dump(model, model_path)
 
 
 class TrainingAttributionToolsModel:
@@ -40,18 +68,22 @@ class TrainingAttributionToolsModel:
         :return: pandas dataframe with incidents
         """
         intrusion_sets_stix = get_instrusion_sets_stats(self.intrusion_sets_data)
-        generator = IncidentGenerator()
-        dict_data = dict(items=[], label=[])
-
-        for label_name, intrusion_set in intrusion_sets_stix.items():
-            for _ in range(N_PER_LABEL):
-                items = " ".join(generator.generate(intrusion_set))
-                if not items:
-                    items = " "
-                dict_data["items"].append(items)
-                dict_data["label"].append(label_name)
-
-        pd_incidents = pd.DataFrame.from_dict(dict_data)
+        # Labels are independent of each other, so each one is generated in its own worker.
+        results = Parallel(n_jobs=-1, backend="loky")(
+            delayed(_generate_label_incidents)(label_name, intrusion_set, N_PER_LABEL, seed=BASE_SEED + index)
+            for index, (label_name, intrusion_set) in enumerate(intrusion_sets_stix.items())
+        )
+
+        # Preallocate the full columns up front; each label fills its own slice.
+        total = len(results) * N_PER_LABEL
+        items_arr = np.empty(total, dtype=object)
+        labels_arr = np.empty(total, dtype=object)
+        for index, (label_name, items_list) in enumerate(results):
+            start = index * N_PER_LABEL
+            items_arr[start : start + N_PER_LABEL] = items_list
+            labels_arr[start : start + N_PER_LABEL] = label_name
+
+        pd_incidents = pd.DataFrame({"items": items_arr, "label": labels_arr}, copy=False)
         return pd_incidents
 
     def retrain_model(self):
@@ -67,9 +99,12 @@ class TrainingAttributionToolsModel:
             incidents_train, incidents_test, incident_labels_train, incident_labels_test = train_test_split(
                 incidents, incident_labels, random_state=27, stratify=incident_labels, test_size=0.2
             )
+            # A fixed-dimension hashed representation keeps the model size independent of the
+            # vocabulary, and the linear classifier gives sparse predict_proba without the dense
+            # per-class/per-feature arrays of BernoulliNB.
             baseline_pipeline = make_pipeline(
-                CountVectorizer(binary=True, tokenizer=lambda doc: doc.split(" ")),
-                BernoulliNB(),
+                HashingVectorizer(n_features=2**18, tokenizer=str.split, binary=True, alternate_sign=False),
+                SGDClassifier(loss="log_loss", alpha=1e-5, random_state=27),
             )
             baseline_pipeline.fit(incidents_train, incident_labels_train)
             y_test_pred = baseline_pipeline.predict(incidents_test)
@@ -1,4 +1,5 @@
 """Utility functions"""
+import ast
 
 
 def increment_database_version(database_version):
@@ -9,9 +10,8 @@ def increment_database_version(database_version):
 
     >>> increment_database_version("(1, 2, 2)")
     '(1, 2, 3)'
+    >>> increment_database_version("(1,2, 2)")
+    '(1, 2, 3)'
     """
-    database_version = database_version.replace("(", "").replace(")", "")
-    database_version = database_version.split(", ")
-    database_version[2] = str(int(database_version[2]) + 1)
-    database_version = ", ".join(database_version)
-    return "(" + database_version + ")"
+    major, minor, micro = ast.literal_eval(database_version)
+    return str((major, minor, micro + 1))
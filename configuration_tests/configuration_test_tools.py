@@ -1,22 +1,56 @@
-import argparse
+import copy
+import functools
+import mmap
 import os
 import re
 import shlex
-from functools import reduce
+from collections import ChainMap
+from collections.abc import Mapping
 from pathlib import Path
+from types import MappingProxyType
 
 import yaml
-from jinja2cli import cli
+from jinja2 import Environment, FileSystemLoader
+
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # libyaml bindings are optional in PyYAML builds
+    from yaml import SafeLoader as _YamlLoader
+
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick is an optional accelerator, the regex path is the fallback
+    ahocorasick = None
 
 from attribution_tools.pyspark_main import parse_args as main_arg_parser
 
 # Matches alphanumeric parameter names with dashes/underscores and dots surrounded by '${...}' and
 # captures the parameter name.
-PARAM_TEMPLATE_RE = re.compile(r"\${([a-zA-Z0-9\-_.]+)}")
+PARAM_TEMPLATE_RE = re.compile(r"\${([a-zA-Z0-9\-_.]+)}", re.ASCII)
 
 # Matches alphanumeric flow names with underscores/dashes. A "'" might be present to end a shell command and
 # captures the flow name.
-FLOW_NAME_RE = re.compile(r"\s+FLOW=([a-zA-Z0-9\-_]+)'?\s+")
+FLOW_NAME_RE = re.compile(r"\s+FLOW=([a-zA-Z0-9\-_]+)'?\s+", re.ASCII)
+
+# Bytes twin of FLOW_NAME_RE, used when scanning the memory-mapped Jenkinsfile.
+FLOW_NAME_RE_B = re.compile(rb"\s+FLOW=([a-zA-Z0-9\-_]+)'?\s+", re.ASCII)
+
+# Parameter-dict size above which the Aho-Corasick scan beats the alternation regex.
+_AHOCORASICK_MIN_PARAMS = 32
+
+# Canonical project root, computed once; resolving drops the symbolic '..' segment so the
+# paths derived from it are stable cache keys.
+_PROJECT_ROOT = (Path(__file__).parent / "..").resolve()
+
+
+@functools.lru_cache(maxsize=None)
+def _build_param_sub_re(param_names):
+    """Compile a single alternation pattern matching any '${name}' placeholder in param_names.
+
+    :param param_names: tuple of parameter names, hashable so the compiled pattern is cached.
+    :return: compiled pattern capturing the parameter name.
+    """
+    return re.compile(r"\$\{(" + "|".join(re.escape(name) for name in param_names) + r")\}", re.ASCII)
 
 
 def find_jinja2_flows_in_jenkinsfile():
@@ -24,12 +58,16 @@ def find_jinja2_flows_in_jenkinsfile():
 
     :return: list of flow names mentioned in Jenkinsfile.
     """
-    flows = set()
+    # dict.fromkeys deduplicates while keeping first-seen order, so the result is
+    # deterministic across runs.
+    flows = {}
     jenkinsfile_path = relative_to_project_root("Jenkinsfile")
-    if jenkinsfile_path.exists():
-        with open(jenkinsfile_path, "r") as jenkinsfile:
-            for occurrence in FLOW_NAME_RE.finditer(jenkinsfile.read()):
-                flows.add(occurrence.groups()[0])
+    if jenkinsfile_path.exists() and jenkinsfile_path.stat().st_size > 0:
+        with open(jenkinsfile_path, "rb") as jenkinsfile:
+            # mmap lets the regex scan the file without materializing it as a Python string.
+            with mmap.mmap(jenkinsfile.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+                for occurrence in FLOW_NAME_RE_B.finditer(mapped_file):
+                    flows[occurrence.group(1).decode()] = None
     return list(flows)
 
 
@@ -41,15 +79,13 @@ def get_cmdlns_from_template(template_path, deployment_type):
     :param deployment_type: deployment environment, for template rendering.
     :return: list of command lines without parameters.
     """
-    command_lines = set()
     rendered_flow = render_to_dict(file_path=template_path, deployment_type=deployment_type)
 
     template_params = get_config_from_rendered_template(rendered_flow)
     template_cmdlns = get_cmdlns_from_rendered_template(rendered_flow)
 
-    for cmdln in template_cmdlns:
-        actual_cmd_line = substitute_cmdln_parameters(cmdln, template_params)
-        command_lines.add(actual_cmd_line)
+    # Deduplicate in first-seen order so the result is deterministic across runs.
+    command_lines = dict.fromkeys(substitute_cmdln_parameters(cmdln, template_params) for cmdln in template_cmdlns)
     return list(command_lines)
 
 
@@ -60,11 +96,12 @@ def get_cmdlns_from_rendered_template(rendered_template):
     :param rendered_template: dictionary containing a rendered jinja2 template.
     :return: list of command lines.
     """
-    command_lines = set()
-    if "nodes" in rendered_template:
-        for node in rendered_template["nodes"]:
-            if "config" in node and "command" in node["config"]:
-                command_lines.add(node["config"]["command"])
+    # Deduplicate in first-seen order so the result is deterministic across runs.
+    command_lines = dict.fromkeys(
+        node["config"]["command"]
+        for node in rendered_template.get("nodes", [])
+        if "config" in node and "command" in node["config"]
+    )
     return list(command_lines)
 
 
@@ -77,20 +114,24 @@ def get_config_from_rendered_template(rendered_template):
     return rendered_template["config"]
 
 
+@functools.lru_cache(maxsize=1024)
 def split_cmdln(cmdln):
     """Split command line string usig shell-like syntax.
 
+    The result is a cached tuple, so identical command lines across templates are only
+    run through shlex once; callers needing a mutable list should copy it.
+
     :param cmdln: Command line string.
-    :return: List containing splitted command line.
+    :return: Tuple containing splitted command line.
 
     Examples:
 
     >>> split_cmdln("echo Hello, world!")
-    ['echo', 'Hello,', 'world!']
+    ('echo', 'Hello,', 'world!')
     >>> split_cmdln("")
-    []
+    ()
     """
-    return shlex.split(cmdln)
+    return tuple(shlex.split(cmdln))
 
 
 def relative_to_project_root(input_path):
@@ -99,37 +140,54 @@ def relative_to_project_root(input_path):
     :param input_path: original path.
     :return: pathlib.Path relative to the project root
     """
-    return Path(__file__).parent / ".." / input_path
+    return _PROJECT_ROOT / input_path
+
+
+@functools.lru_cache(maxsize=None)
+def _get_jinja_env(template_dir):
+    """Return a persistent jinja2 Environment per template directory.
+
+    Compiled template bytecode is cached by the Environment, so repeated renders skip the
+    lexer/parser/compile passes a fresh Environment per call would repeat.
+    """
+    env = Environment(
+        loader=FileSystemLoader(template_dir), keep_trailing_newline=True, auto_reload=False, cache_size=400
+    )
+    # jinja2cli exposed os.environ lookups through an `environ` global; the templates rely on it.
+    env.globals["environ"] = os.environ.get
+    return env
+
+
+@functools.lru_cache(maxsize=None)
+def _render_template_cached(file_path, deployment_type):
+    """Render and YAML-parse a jinja2 flow template once per (path, deployment type)."""
+    os.environ["CONFIG"] = deployment_type
+    os.environ["DEPLOYMENTTYPE"] = deployment_type
+    os.environ["PROJECT_NAME"] = "project-name-stub"
+
+    template_path = Path(file_path)
+    flow_rendered = _get_jinja_env(str(template_path.parent) or ".").get_template(template_path.name).render({})
+    return yaml.load(flow_rendered, Loader=_YamlLoader)
 
 
 def render_to_dict(file_path, deployment_type):
     """Renders a jinja2 flow template to a dict. What is more, as we are trying to simulate job building by Azkaban,
     azkaban.flow.execid and version is added to the dictonary.
 
+    Rendering and YAML parsing are memoized per (file_path, deployment_type); the stub injection
+    happens on a deep copy so callers cannot mutate the cached flow.
+
     :param file_path: Full path to a jinja2 flow file.
     :param deployment_type: Should be in ("staging", "production)
     :return: Dictionary containing rendered jinja2 flow.
     """
-    os.environ["CONFIG"] = deployment_type
-    os.environ["DEPLOYMENTTYPE"] = deployment_type
-    os.environ["PROJECT_NAME"] = "project-name-stub"
-
-    flow_rendered = cli.render(file_path, {}, [])
-    flow_loaded = yaml.load(flow_rendered, Loader=yaml.FullLoader)
+    flow_loaded = copy.deepcopy(_render_template_cached(str(file_path), deployment_type))
     flow_loaded["config"]["version"] = "project-version-stub"
     flow_loaded["config"]["azkaban.flow.execid"] = "azkaban-flow-id-stub"
 
     return flow_loaded
 
 
-def _param_references_present(param_dict):
-    for param_name in param_dict.keys():
-        param_name_references = [f"${{{param_name}}}" in str(param_value) for param_value in param_dict.values()]
-        if any(param_name_references):
-            return True
-    return False
-
-
 def check_if_recursive_param_reference_present(param_dict):
     for param_name, param_value in param_dict.items():
         is_recursive = f"${{{param_name}}}" in str(param_value)
@@ -151,15 +209,79 @@ def normalize_param_dict(param_dict):
     :param param_dict: dictionary containing parameter names and values.
     :return: None
     """
-    while _param_references_present(param_dict):
-        check_if_recursive_param_reference_present(param_dict)
-        for param_name, original_value in param_dict.items():
-            substituted_value = original_value
-            for match in PARAM_TEMPLATE_RE.finditer(str(original_value)):
-                param_reference = match.groups()[0]
-                substituted_value = substituted_value.replace(f"${{{param_reference}}}", param_dict[param_reference])
-            if substituted_value != original_value:
-                param_dict[param_name] = substituted_value
+    if not param_dict:
+        return
+    combined_re = _build_param_sub_re(tuple(param_dict))
+
+    # Every value is converted to string exactly once; the cache is updated as parameters
+    # get resolved so the substitution callback never re-converts.
+    str_values = {param_name: str(param_value) for param_name, param_value in param_dict.items()}
+    check_if_recursive_param_reference_present(str_values)
+
+    # Dependency graph between parameters, built with one scan per value. The substring guard
+    # skips the regex entirely for the common placeholder-free values.
+    dependencies = {}
+    for param_name, value_str in str_values.items():
+        if "${" not in value_str:
+            dependencies[param_name] = []
+        else:
+            dependencies[param_name] = [ref for ref in PARAM_TEMPLATE_RE.findall(value_str) if ref in param_dict]
+    resolved = set()
+
+    def resolve(param_name, visiting):
+        if param_name in resolved:
+            return
+        if param_name in visiting:
+            raise ValueError(f"Recursive reference found, while normalizing parameter dict:\n {param_dict}")
+        visiting.add(param_name)
+        for reference in dependencies[param_name]:
+            resolve(reference, visiting)
+        visiting.discard(param_name)
+        if dependencies[param_name]:
+            new_value = combined_re.sub(lambda match: str_values[match.group(1)], str_values[param_name])
+            param_dict[param_name] = new_value
+            str_values[param_name] = new_value
+        resolved.add(param_name)
+
+    for param_name in param_dict:
+        resolve(param_name, set())
+
+
+def _substitute_cmdln_with_automaton(cmdln, param_dict):
+    """Replace every '${name}' placeholder with one Aho-Corasick scan over the command line.
+
+    The automaton matches the placeholder literals directly, so the scan is linear in the
+    command line length regardless of how many parameters the alternation regex would carry.
+    Placeholders left unmatched between the hits are unknown names and raise like the regex path.
+
+    :param cmdln: string representing a command line with parameter placeholders.
+    :param param_dict: dict containing parameter names and values.
+    :return: string representing the substituted command line.
+    """
+
+    def _check_unknown(segment):
+        unknown = PARAM_TEMPLATE_RE.search(segment)
+        if unknown:
+            raise ValueError("Parameter {} required in '{}' is not defined.".format(unknown.group(1), cmdln))
+
+    automaton = ahocorasick.Automaton()
+    for param_name, param_value in param_dict.items():
+        placeholder = f"${{{param_name}}}"
+        automaton.add_word(placeholder, (len(placeholder), str(param_value)))
+    automaton.make_automaton()
+
+    pieces = []
+    last_end = 0
+    for end_index, (placeholder_len, value_str) in automaton.iter(cmdln):
+        gap = cmdln[last_end : end_index + 1 - placeholder_len]
+        _check_unknown(gap)
+        pieces.append(gap)
+        pieces.append(value_str)
+        last_end = end_index + 1
+    tail = cmdln[last_end:]
+    _check_unknown(tail)
+    pieces.append(tail)
+    return "".join(pieces)
 
 
 def substitute_cmdln_parameters(cmdln, param_dict):
@@ -172,14 +294,94 @@ def substitute_cmdln_parameters(cmdln, param_dict):
     :param param_dict: dict containing parameter names and values.
     :return: string representing the substituted command line.
     """
-    for param_template in PARAM_TEMPLATE_RE.finditer(cmdln):
-        param_name = param_template.groups()[0]
-        if param_name not in param_dict:
-            raise ValueError("Parameter {} required in '{}' is not defined.".format(param_name, cmdln))
+    if "${" not in cmdln:
+        return cmdln
+
+    if ahocorasick is not None and len(param_dict) > _AHOCORASICK_MIN_PARAMS:
+        return _substitute_cmdln_with_automaton(cmdln, param_dict)
+
+    def _replace(match):
+        param_name = match.group(1)
+        try:
+            return str(param_dict[param_name])
+        except KeyError:
+            raise ValueError("Parameter {} required in '{}' is not defined.".format(param_name, cmdln)) from None
+
+    # A single pass both validates and substitutes: unknown names raise from the callback.
+    return PARAM_TEMPLATE_RE.sub(_replace, cmdln)
 
-    for param_name, param_value in param_dict.items():
-        cmdln = cmdln.replace("${" + param_name + "}", str(param_value))
-    return cmdln
+
+class LazyParamMap(Mapping):
+    """Read-only view over the merged flow parameters that resolves references on access.
+
+    The flow configs are stacked in a ChainMap instead of being merged eagerly, and a
+    parameter's '${name}' references are substituted (transitively, with cycle detection)
+    the first time that key is read. Callers that only query a few keys thus skip the
+    normalization work for every unrelated parameter.
+    """
+
+    def __init__(self, param_maps):
+        self._params = ChainMap(*param_maps)
+        self._combined_re = _build_param_sub_re(tuple(self._params))
+        self._resolved = {}
+
+    def __getitem__(self, key):
+        if key in self._resolved:
+            return self._resolved[key]
+        return self._resolve(key, set())
+
+    def __iter__(self):
+        return iter(self._params)
+
+    def __len__(self):
+        return len(self._params)
+
+    def _resolve(self, key, visiting):
+        if key in self._resolved:
+            return self._resolved[key]
+        if key in visiting:
+            raise ValueError(f"Recursive reference found, while normalizing parameter dict:\n {dict(self._params)}")
+        value = self._params[key]
+        value_str = str(value)
+        if "${" in value_str:
+            references = [ref for ref in PARAM_TEMPLATE_RE.findall(value_str) if ref in self._params]
+            visiting.add(key)
+            for reference in references:
+                self._resolve(reference, visiting)
+            visiting.discard(key)
+            if references:
+                value = self._combined_re.sub(lambda match: str(self._resolved[match.group(1)]), value_str)
+        self._resolved[key] = value
+        return value
+
+
+@functools.lru_cache(maxsize=None)
+def _collect_lazy_parameters(flow_templates_paths, deployment_type):
+    """Render the given flow templates and stack their parameters in a LazyParamMap.
+
+    :param flow_templates_paths: tuple of template paths, hashable so the result is cached.
+    :param deployment_type: deployment environment, for template rendering.
+    :return: LazyParamMap resolving parameter references on demand.
+    """
+    flow_configs = [
+        get_config_from_rendered_template(render_to_dict(file_path=template_path, deployment_type=deployment_type))
+        for template_path in flow_templates_paths
+    ]
+    # ChainMap lookups hit the first map first, so reverse to keep the
+    # "more recent templates overwrite" merge order.
+    return LazyParamMap(reversed(flow_configs))
+
+
+@functools.lru_cache(maxsize=None)
+def _collect_all_parameters(flow_templates_paths, deployment_type):
+    """Materialize the fully normalized parameters of the given flow templates once.
+
+    :param flow_templates_paths: tuple of template paths, hashable so the result is cached.
+    :param deployment_type: deployment environment, for template rendering.
+    :return: read-only mapping with the normalized parameters.
+    """
+    lazy_map = _collect_lazy_parameters(flow_templates_paths, deployment_type)
+    return MappingProxyType({param_name: lazy_map[param_name] for param_name in lazy_map})
 
 
 def get_main_arguments_from_cmdln(cmdln):
@@ -191,11 +393,29 @@ def get_main_arguments_from_cmdln(cmdln):
     """
     if "main.py" in cmdln:
         before, arguments = cmdln.split("main.py")
-        return split_cmdln(arguments)
+        return list(split_cmdln(arguments))
     else:
         return None
 
 
+@functools.lru_cache(maxsize=None)
+def _parse_arguments_cached(arguments):
+    """Run the main.py argument parser once per distinct argument tuple.
+
+    The raised exception (argparse signals failure with SystemExit) is part of the cached
+    outcome, so repeated occurrences of the same argument list across templates are not
+    re-parsed either way.
+
+    :param arguments: tuple of command line arguments.
+    :return: None on success, or the exception the parser raised.
+    """
+    try:
+        main_arg_parser(list(arguments))
+        return None
+    except (SystemExit, Exception) as error:  # pylint: disable=broad-except
+        return error
+
+
 def parse_arguments(arguments):
     """Uses the arg_parser defined in main.py to parse the argument list.
     Exceptions raised are caught by the caller to determine if parsing was successful.
@@ -203,8 +423,9 @@ def parse_arguments(arguments):
     :param arguments: list of command line arguments.
     :return: None
     """
-    argparse.ArgumentParser.parse_args.__defaults__ = (arguments, None)
-    main_arg_parser()
+    outcome = _parse_arguments_cached(tuple(arguments))
+    if outcome is not None:
+        raise outcome
 
 
 class ConfigurationTestTools:
@@ -240,12 +461,13 @@ class ConfigurationTestTools:
     def find_jinja2_templates(self):
         """Finds all file names in the Azkaban template directory that will be rendered by Jinja2.
 
+        The result is sorted so the parameter merge order (and the render cache keys) do not
+        depend on filesystem iteration order.
+
         :return: List of strings representing Jinja2 template files
         """
         absolute_template_dir = relative_to_project_root(self.azkaban_template_dir)
-        return [
-            str(file_path) for file_path in absolute_template_dir.iterdir() if file_path.name.endswith(".flow.jinja2")
-        ]
+        return sorted(str(file_path) for file_path in absolute_template_dir.glob("*.flow.jinja2"))
 
     def get_all_main_arguments(self, deployment_type):
 
@@ -256,34 +478,21 @@ class ConfigurationTestTools:
         return main_arguments
 
     def get_all_parameters(self, deployment_type):
+        """Returns the merged, normalized parameters of all flow templates.
 
-        flow_templates_paths = self.find_jinja2_templates()
-
-        flow_configs = {}
-        for template_path in flow_templates_paths:
-            rendered_flow = render_to_dict(file_path=template_path, deployment_type=deployment_type)
-            flow_configs[template_path] = get_config_from_rendered_template(rendered_flow)
-
-        # Merge all parameters into a single dict, more recent values are overwritten
-        all_parameters = reduce(lambda dict1, dict2: {**dict1, **dict2}, flow_configs.values())
-
-        # Resolve recursive parameter references
-        normalize_param_dict(all_parameters)
-
-        return all_parameters
+        The result is memoized per (template set, deployment_type) and returned as a read-only
+        mapping so callers cannot mutate the shared cache entry.
+        """
+        return _collect_all_parameters(tuple(self.find_jinja2_templates()), deployment_type)
 
     def get_parameters_by_key_matching(self, regexp, deployment_type):
-        all_params = self.get_all_parameters(deployment_type)
-        filtered_params = {}
-        for k, v in all_params.items():
-            if re.match(regexp, k):
-                filtered_params[k] = v
-        return filtered_params
+        # The lazy map only resolves the keys the pattern selects, so unrelated
+        # parameters are never normalized.
+        lazy_params = _collect_lazy_parameters(tuple(self.find_jinja2_templates()), deployment_type)
+        pattern = re.compile(regexp)
+        return {k: lazy_params[k] for k in lazy_params if pattern.match(k)}
 
     def get_parameters_by_value_matching(self, regexp, deployment_type):
         all_params = self.get_all_parameters(deployment_type)
-        filtered_params = {}
-        for k, v in all_params.items():
-            if re.match(regexp, str(v)):
-                filtered_params[k] = v
-        return filtered_params
+        pattern = re.compile(regexp)
+        return {k: v for k, v in all_params.items() if pattern.match(str(v))}
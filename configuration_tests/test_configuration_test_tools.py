@@ -2,6 +2,8 @@ from pathlib import Path
 from unittest import TestCase
 
 from configuration_tests.configuration_test_tools import (
+    _AHOCORASICK_MIN_PARAMS,
+    _substitute_cmdln_with_automaton,
     get_main_arguments_from_cmdln,
     normalize_param_dict,
     relative_to_project_root,
@@ -11,7 +13,7 @@ from configuration_tests.configuration_test_tools import (
 
 class ConfigurationTestToolsTests(TestCase):
 
-    project_root_dir = Path(__file__).parent / ".."
+    project_root_dir = (Path(__file__).parent / "..").resolve()
 
     def test_relative_to_project_root_with_empty_path(self):
         self.assertEqual(relative_to_project_root(""), self.project_root_dir)
@@ -95,3 +97,33 @@ class ConfigurationTestToolsTests(TestCase):
         param_dict = {"a": "${b}", "b": "${a}"}
         with self.assertRaises(ValueError):
             normalize_param_dict(param_dict)
+
+    def test_substitute_cmdln_with_automaton_replaces_known_parameters(self):
+        parameters = {"int_parameter": 123, "string_parameter": "hello"}
+        template_cmd_line = "main.py --int-arg ${int_parameter} --str-arg ${string_parameter}"
+
+        expected_cmd_line = "main.py --int-arg 123 --str-arg hello"
+
+        self.assertEqual(expected_cmd_line, _substitute_cmdln_with_automaton(template_cmd_line, parameters))
+
+    def test_substitute_cmdln_with_automaton_replaces_adjacent_placeholders(self):
+        parameters = {"base_dir": "my/path", "file_name": "file.txt"}
+        template_cmd_line = "cat ${base_dir}${file_name}"
+
+        self.assertEqual("cat my/pathfile.txt", _substitute_cmdln_with_automaton(template_cmd_line, parameters))
+
+    def test_substitute_cmdln_with_automaton_raises_exception_with_undefined_parameters(self):
+        parameters = {"invalid_parameter": 123}
+        template_cmd_line = "main.py --int-arg ${int_parameter} --str-arg ${invalid_parameter}"
+
+        with self.assertRaises(ValueError):
+            _substitute_cmdln_with_automaton(template_cmd_line, parameters)
+
+    def test_substitute_cmdln_parameters_matches_automaton_path_for_large_param_dicts(self):
+        parameters = {f"param_{index}": index for index in range(_AHOCORASICK_MIN_PARAMS + 1)}
+        template_cmd_line = "main.py --first ${param_0} --last ${param_32} plain"
+
+        expected_cmd_line = "main.py --first 0 --last 32 plain"
+
+        self.assertEqual(expected_cmd_line, substitute_cmdln_parameters(template_cmd_line, parameters))
+        self.assertEqual(expected_cmd_line, _substitute_cmdln_with_automaton(template_cmd_line, parameters))
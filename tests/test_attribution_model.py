@@ -2,14 +2,29 @@
 from pathlib import Path, PurePath
 
 import pytest
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+from sklearn.pipeline import make_pipeline
 
-from attribution_tools.attribution_model import AttributionToolsModel, META_DATA_FILENAME
+from attribution_tools.attribution_model import AttributionToolsModel, META_DATA_FILENAME, TOP_N
 from attribution_tools.train_attribution_model import TrainingAttributionToolsModel
 
 MODEL_PATH_LOCATION = "attribution_tools/data"
 INTRUSION_SET_PATH = "tests/data/intrusion_sets_example.json"
 
 
+def build_trained_model(n_labels):
+    """Train a tiny pipeline in memory so predictions run without model files on disk."""
+    incidents = [f"token-{index} shared-token" for index in range(n_labels)] * 5
+    labels = [f"label-{index}" for index in range(n_labels)] * 5
+    pipeline = make_pipeline(
+        HashingVectorizer(n_features=2**10, tokenizer=str.split, binary=True, alternate_sign=False),
+        SGDClassifier(loss="log_loss", random_state=27),
+    )
+    pipeline.fit(incidents, labels)
+    return pipeline
+
+
 class TestAttributionToolsModel:
     """The model that lables incidents by intrusions set labels"""
 
@@ -50,6 +65,33 @@ class TestAttributionToolsModel:
         incident_val = model.predict("malware-fysbis attack-pattern-t1571")
         assert incident_val["label"] == -2, "The score for wrong model location should be `-2`."
 
+    def test_predict_batch_preserves_input_order_with_mixed_inputs(self):
+        """Check that invalid entries keep `-1` in place and valid ones get top-N predictions"""
+        model = AttributionToolsModel(model=build_trained_model(4))
+        results = model.predict_batch(["token-0 shared-token", None, "", "token-1 shared-token"])
+        assert results[1]["label"] == -1, "The score for `None` should be `-1`."
+        assert results[2]["label"] == -1, "The score for `''` should be `-1`."
+        for index in (0, 3):
+            label_val = results[index]["label"]
+            assert len(label_val["labels"]) == TOP_N, "Valid entries should get TOP_N labels."
+            assert label_val["probas"] == sorted(label_val["probas"], reverse=True), "Probas should be descending."
+        assert results[0]["label"]["labels"][0] == "label-0", "The top label should match the incident."
+        assert results[3]["label"]["labels"][0] == "label-1", "The top label should match the incident."
+
+    def test_predict_batch_with_fewer_classes_than_top_n(self):
+        """Check that models with fewer classes than TOP_N return all of them in order"""
+        model = AttributionToolsModel(model=build_trained_model(2))
+        label_val = model.predict_batch(["token-1 shared-token"])[0]["label"]
+        assert len(label_val["labels"]) == 2, "All classes should be returned when there are fewer than TOP_N."
+        assert label_val["probas"] == sorted(label_val["probas"], reverse=True), "Probas should be descending."
+        assert label_val["labels"][0] == "label-1", "The top label should match the incident."
+
+    def test_predict_batch_with_missing_model_files(self):
+        """Check that a missing model yields `-2` only for the valid entries"""
+        model = AttributionToolsModel(initial_path="")
+        results = model.predict_batch([None, "malware-fysbis attack-pattern-t1571", ""])
+        assert [result["label"] for result in results] == [-1, -2, -1], "Error codes should stay in input order."
+
     def test_db_version_format(self):
         """Check that when no db version is provided default version of db will be used"""
         incident_val = self.model.predict(None)
@@ -0,0 +1,59 @@
+"""Unit tests for the incident generator"""
+import numpy
+import pytest
+
+from attribution_tools.generator import generate_incident_sizes, IncidentGenerator
+from attribution_tools.parsers import AttackPattern, Indicator, IntrusionSet, Malware, Tool
+
+
+def build_intrusion_set(n_per_category=10):
+    """Build an intrusion set with a known number of entities per category."""
+    intrusion_set = IntrusionSet(identifier="intrusion-set--test")
+    for index in range(n_per_category):
+        intrusion_set.add_related_entity(AttackPattern(f"ap-{index}", semantic_id=f"attack-pattern-T{index}"))
+        intrusion_set.add_related_entity(Malware(f"mw-{index}", semantic_id=f"malware-M{index}"))
+        intrusion_set.add_related_entity(Tool(f"tool-{index}", semantic_id=f"tool-X{index}"))
+        intrusion_set.add_related_entity(Indicator(f"ind-{index}", semantic_id=f"indicator--{index}"))
+    return intrusion_set
+
+
+class TestIncidentGenerator:
+    """The generator that turns intrusion sets into incident strings"""
+
+    @pytest.fixture(scope="function", autouse=True)
+    def setup_preprocess(self):
+        """Set up the class"""
+        self.generator = IncidentGenerator()
+        self.intrusion_set = build_intrusion_set()
+
+    def test_compute_ks_values(self):
+        """Check the per-category counts for a batch of incident sizes"""
+        ks = self.generator.compute_ks(numpy.asarray([10, 25]))
+        assert ks["attack-pattern"].tolist() == [5, 13], "Attack patterns should take half of the incident."
+        assert ks["tool"].tolist() == [2, 5], "Tools should take a fifth of the incident."
+        assert ks["malware"].tolist() == [2, 5], "Malwares should take a fifth of the incident."
+        assert ks["other"].tolist() == [1, 3], "Other entities should take a tenth of the incident."
+
+    def test_generate_batch_respects_category_budgets(self):
+        """Check that every generated incident draws within the per-category counts"""
+        sizes = generate_incident_sizes(self.generator.N_SIZE_MIN, self.generator.N_SIZE_MAX, 5)
+        incidents = self.generator.generate_batch(self.intrusion_set, sizes)
+        assert len(incidents) == len(sizes), "One incident should be generated per size."
+
+        ks = self.generator.compute_ks(numpy.minimum(sizes, 40))
+        for row, incident in enumerate(incidents):
+            tokens = incident.split()
+            assert len(tokens) == len(set(tokens)), "Tokens should be deduplicated within an incident."
+            for prefix, category in (("attack-pattern-", "attack-pattern"), ("tool-", "tool"), ("malware-", "malware")):
+                count = sum(token.startswith(prefix) for token in tokens)
+                assert 1 <= count <= ks[category][row], f"The {category} count should stay within its budget."
+            other_count = sum(token.startswith("indicator--") for token in tokens)
+            assert other_count == min(10, ks["other"][row]), "Other entities should be drawn without replacement."
+
+    def test_generate_batch_matches_generate_categories(self):
+        """Check that the batch path draws from the same categories as the single-incident path"""
+        incident_tokens = self.generator.generate(self.intrusion_set, n_size=20)
+        batch_tokens = self.generator.generate_batch(self.intrusion_set, numpy.asarray([20]))[0].split()
+        valid_prefixes = ("attack-pattern-", "malware-", "tool-", "indicator--")
+        for tokens in (incident_tokens, batch_tokens):
+            assert all(token.startswith(valid_prefixes) for token in tokens), "Tokens should be known semantic ids."